@@ -23,7 +23,7 @@ class ContentSensitivity(Enum):
     HIGHLY_SENSITIVE = "highly_sensitive"
 
 
-@dataclass
+@dataclass(slots=True)
 class NERResult:
     """Named Entity Recognition result"""
     entities: List[Dict[str, str]]  
@@ -32,7 +32,7 @@ class NERResult:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ContentValidation:
     """Content validation result"""
     contains_sensitive_data: bool
@@ -19,7 +19,7 @@ class QueryIntent(Enum):
     GENERAL_INFO = "general_info"
     UNKNOWN = "unknown"
 
-@dataclass
+@dataclass(slots=True)
 class IntentClassification:
     """Result of intent classification"""
     intent: QueryIntent
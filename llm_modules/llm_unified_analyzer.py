@@ -28,7 +28,7 @@ class RiskLevel(Enum):
     HIGH_RISK = "high_risk"
     CRITICAL_RISK = "critical_risk"
 
-@dataclass
+@dataclass(slots=True)
 class UnifiedAnalysis:
     """Combined result of intent classification and guardrails analysis"""
     # Intent Classification
@@ -189,32 +189,7 @@ Respond with JSON only:
             )
             
             result = json.loads(response.choices[0].message.content)
-            
-            # Extract classification data
-            classification = result['intent_classification']
-            security = result['security_analysis']
-            decision = result['unified_decision']
-            
-            return UnifiedAnalysis(
-                # Intent Classification
-                intent=QueryIntent(classification['category'].lower()),
-                confidence=classification['confidence'],
-                reasoning=classification['reasoning'],
-                keywords=classification['keywords'],
-                is_policy_related=classification['is_policy_related'],
-                is_financial_sensitive=classification['is_financial_sensitive'],
-                
-                # Security Analysis
-                overall_risk=RiskLevel(security['overall_risk'].lower()),
-                contains_sensitive_data=security['contains_sensitive_data'],
-                detected_issues=security['detected_issues'],
-                recommendation=security['recommendation'],
-                
-                # Unified Decision
-                should_allow=decision['should_allow'],
-                filter_action=decision['filter_action'],
-                security_notes=decision['final_reasoning']
-            )
+            return self._analysis_from_json(result)
             
         except json.JSONDecodeError as e:
             print(f"JSON parsing error: {e}")
@@ -223,6 +198,153 @@ Respond with JSON only:
             print(f"LLM API error: {e}")
             raise
     
+    @staticmethod
+    def _analysis_from_json(result: Dict[str, Any]) -> UnifiedAnalysis:
+        """Build a UnifiedAnalysis from the model's JSON result object"""
+        classification = result['intent_classification']
+        security = result['security_analysis']
+        decision = result['unified_decision']
+        
+        return UnifiedAnalysis(
+            # Intent Classification
+            intent=QueryIntent(classification['category'].lower()),
+            confidence=classification['confidence'],
+            reasoning=classification['reasoning'],
+            keywords=classification['keywords'],
+            is_policy_related=classification['is_policy_related'],
+            is_financial_sensitive=classification['is_financial_sensitive'],
+            
+            # Security Analysis
+            overall_risk=RiskLevel(security['overall_risk'].lower()),
+            contains_sensitive_data=security['contains_sensitive_data'],
+            detected_issues=security['detected_issues'],
+            recommendation=security['recommendation'],
+            
+            # Unified Decision
+            should_allow=decision['should_allow'],
+            filter_action=decision['filter_action'],
+            security_notes=decision['final_reasoning']
+        )
+    
+    def analyze_batch(self, items: List[tuple], batch_size: int = 16) -> List[UnifiedAnalysis]:
+        """
+        Analyze many (query, response, user_role) items in batched API calls.
+        
+        Per-call latency dominates over token cost, so sending up to
+        batch_size items per request gives near-linear throughput gains
+        for bulk workflows (history indexing, multi-turn analysis).
+        
+        Args:
+            items: List of (query, response, user_role) tuples
+            batch_size: Maximum items per API call
+            
+        Returns:
+            List of UnifiedAnalysis results in input order
+        """
+        if not self.client:
+            return [self._fallback_analysis(q, r, role) for q, r, role in items]
+        
+        results = []
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            try:
+                start_time = datetime.now()
+                results.extend(self._batched_llm_analysis(chunk))
+                self.stats['total_analyses'] += len(chunk)
+                self.stats['unified_calls'] += 1
+                
+                response_time = (datetime.now() - start_time).total_seconds()
+                self.stats['avg_response_time'] = (
+                    (self.stats['avg_response_time'] * (self.stats['unified_calls'] - 1) + response_time)
+                    / self.stats['unified_calls']
+                )
+            except Exception as e:
+                print(f"❌ Batched Analysis Error: {e}")
+                self.stats['errors'] += 1
+                # Degrade to per-item analysis so one bad batch response
+                # doesn't lose the whole chunk
+                results.extend(self.analyze_query_and_response(q, r, role) for q, r, role in chunk)
+        
+        return results
+    
+    def _batched_llm_analysis(self, chunk: List[tuple]) -> List[UnifiedAnalysis]:
+        """Analyze one chunk of items with a single LLM call"""
+        
+        numbered = "\n".join(
+            f'ITEM {i}: QUERY="{query}" RESPONSE="{response}" ROLE={user_role}'
+            for i, (query, response, user_role) in enumerate(chunk)
+        )
+        
+        prompt = f"""
+You are an expert AI security analyst for a corporate knowledge management system.
+For EACH numbered item below, perform BOTH intent classification AND security analysis
+exactly as you would for a single query.
+
+{numbered}
+
+For every item apply:
+
+TASK 1 - INTENT CLASSIFICATION:
+Classify the query into ONE category:
+1. POLICY_PROCEDURE - Company policies, procedures, how-to guides
+2. FINANCIAL_DATA - Specific financial numbers, budgets, revenues
+3. PERSONAL_DATA - Individual employee information, salaries, personal details
+4. GENERAL_INFO - General company information, non-sensitive data
+
+TASK 2 - SECURITY ANALYSIS:
+Assess security risks and sensitive content.
+
+TASK 3 - UNIFIED DECISION:
+Make a final recommendation: ALLOW, ALLOW_WITH_SCREENING, or DENY
+
+Guidelines:
+- PERSONAL_DATA queries about salaries = HIGH_RISK, usually DENY
+- POLICY_PROCEDURE queries = LOW_RISK, usually ALLOW
+- Consider user role: Admin has more access than Junior
+- Be conservative with financial/personal data
+
+Respond with a JSON array of exactly {len(chunk)} objects, one per item in order,
+each with this shape:
+{{
+    "intent_classification": {{
+        "category": "POLICY_PROCEDURE|FINANCIAL_DATA|PERSONAL_DATA|GENERAL_INFO",
+        "confidence": 0.95,
+        "reasoning": "Why this category was chosen",
+        "keywords": ["key", "terms"],
+        "is_policy_related": true/false,
+        "is_financial_sensitive": true/false
+    }},
+    "security_analysis": {{
+        "overall_risk": "LOW_RISK|MEDIUM_RISK|HIGH_RISK|CRITICAL_RISK",
+        "contains_sensitive_data": true/false,
+        "detected_issues": ["issue1", "issue2"],
+        "recommendation": "ALLOW|ALLOW_WITH_SCREENING|DENY",
+        "security_notes": "Brief security assessment"
+    }},
+    "unified_decision": {{
+        "should_allow": true/false,
+        "filter_action": "allow|allow_with_screening|deny",
+        "final_reasoning": "Combined analysis reasoning"
+    }}
+}}
+"""
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a security expert and intent classifier. Always respond with valid JSON. Be thorough but concise."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=600 * len(chunk)
+        )
+        
+        parsed = json.loads(response.choices[0].message.content)
+        if not isinstance(parsed, list) or len(parsed) != len(chunk):
+            raise ValueError(f"Expected {len(chunk)} batch results, got {parsed!r:.200}")
+        
+        return [self._analysis_from_json(result) for result in parsed]
+    
     def _fallback_analysis(self, query: str, response: str, user_role: str) -> UnifiedAnalysis:
         """Fallback analysis using regex patterns when LLM is unavailable"""
         self.stats['fallback_calls'] += 1
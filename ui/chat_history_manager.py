@@ -75,6 +75,13 @@ class ChatSession:
             is_active=data.get('is_active', True)
         )
 
+@dataclass(slots=True)
+class SessionSummary:
+    """Lightweight projection of a chat session for sidebar listings"""
+    session_id: str
+    title: str
+    updated_at: datetime
+
 class ChatHistoryManager:
     """Manages chat history storage and retrieval using Firebase Firestore"""
     
@@ -247,6 +254,58 @@ class ChatHistoryManager:
             print(f"❌ Failed to get user sessions: {e}")
             return []
     
+    def list_session_summaries(self, user_email: str, limit: int = 50, before: Optional[datetime] = None) -> List[SessionSummary]:
+        """
+        Get lightweight session summaries for a user (sidebar hot path)
+
+        Unlike get_user_sessions, this issues a projection query so the
+        nested messages list is never fetched or deserialized.
+
+        Args:
+            user_email: Email of the user
+            limit: Maximum number of summaries to return
+            before: Optional updated_at cursor for pagination
+
+        Returns:
+            List of SessionSummary objects ordered by updated_at descending
+        """
+        try:
+            if not self.db:
+                return []
+
+            # Projection query: only fetch the three fields the sidebar needs
+            # (plus is_active for the soft-delete filter). Sorting stays in
+            # Python to avoid requiring a composite index.
+            sessions_ref = (self.db.collection(self.collection_name)
+                          .where('user_email', '==', user_email)
+                          .select(['session_id', 'title', 'updated_at', 'is_active'])
+                          .limit(limit * 2))  # Get more to account for inactive sessions
+
+            summaries = []
+            for doc in sessions_ref.stream():
+                data = doc.to_dict()
+                if not data.get('is_active', True):
+                    continue
+                updated_at = data['updated_at']
+                if before is not None and updated_at >= before:
+                    continue
+                summaries.append(SessionSummary(
+                    session_id=data['session_id'],
+                    title=data['title'],
+                    updated_at=updated_at
+                ))
+
+            # Sort by updated_at descending and limit results
+            summaries.sort(key=lambda x: x.updated_at, reverse=True)
+            summaries = summaries[:limit]
+
+            print(f"✅ Retrieved {len(summaries)} session summaries for {user_email}")
+            return summaries
+
+        except Exception as e:
+            print(f"❌ Failed to list session summaries: {e}")
+            return []
+
     def get_session(self, session_id: str) -> Optional[ChatSession]:
         """
         Get a specific chat session
@@ -6,8 +6,7 @@ Chat Sidebar Component - Displays chat history in a sidebar similar to ChatGPT
 import streamlit as st
 from datetime import datetime, timedelta
 from typing import List, Optional
-from ui.chat_history_manager import ChatHistoryManager, ChatSession
-import time
+from ui.chat_history_manager import ChatHistoryManager, ChatSession, SessionSummary
 
 class ChatSidebar:
     """Manages the chat history sidebar interface"""
@@ -45,8 +44,8 @@ class ChatSidebar:
             # Start scrollable chat history container
             st.markdown('<div class="chat-history-container">', unsafe_allow_html=True)
             
-            # Get user's chat sessions
-            sessions = self.chat_manager.get_user_sessions(user_email)
+            # Get lightweight session summaries (no message payloads)
+            sessions = self.chat_manager.list_session_summaries(user_email)
             
             if not sessions:
                 st.markdown("""
@@ -89,12 +88,12 @@ class ChatSidebar:
             
             return selected_session_id
     
-    def _render_session_item(self, session: ChatSession, user_email: str) -> Optional[str]:
+    def _render_session_item(self, session: SessionSummary, user_email: str) -> Optional[str]:
         """
         Render a single chat session item
-        
+
         Args:
-            session: The chat session to render
+            session: Summary of the chat session to render
             user_email: Current user's email
             
         Returns:
@@ -134,8 +133,9 @@ class ChatSidebar:
                             session.session_id, new_title.strip(), user_email
                         )
                         if success:
-                            st.success("Title updated!")
-                            time.sleep(0.5)
+                            # Non-blocking notification: st.toast doesn't hold
+                            # the worker thread the way success + sleep did
+                            st.toast("Title updated ✓", icon="✅")
                     st.session_state[edit_mode_key] = False
                     st.rerun()
             with col2:
@@ -156,12 +156,13 @@ class ChatSidebar:
                     help=f"Last updated: {self._format_timestamp(session.updated_at)}",
                     use_container_width=True
                 ):
-                    # Load this session
+                    # Load the full session (summaries don't carry messages)
+                    full_session = self.chat_manager.get_session(session.session_id)
                     st.session_state.current_session_id = session.session_id
                     st.session_state.messages = [
                         {"role": msg.role, "content": msg.content}
-                        for msg in session.messages
-                    ]
+                        for msg in full_session.messages
+                    ] if full_session else []
                     st.rerun()
                     return session.session_id
                 
@@ -202,6 +203,7 @@ class ChatSidebar:
                                     st.session_state.current_session_id = None
                                     st.session_state.messages = []
                                 st.session_state[confirm_key] = False
+                                st.toast("Chat deleted", icon="🗑️")
                                 st.rerun()
                     with col2:
                         if st.button("❌ No", key=f"confirm_no_{session.session_id}", use_container_width=True):
@@ -235,7 +237,7 @@ class ChatSidebar:
         
         return session_id
     
-    def _group_sessions_by_time(self, sessions: List[ChatSession]) -> dict:
+    def _group_sessions_by_time(self, sessions: List[SessionSummary]) -> dict:
         """
         Group sessions by time periods (Today, Yesterday, Last 7 days, etc.)
         
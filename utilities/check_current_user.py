@@ -1,44 +1,59 @@
 import os
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
-import json
-import streamlit as st
+import logging
+import logging.handlers
+from firebase_admin import auth, firestore
+
+# Resolve the shared initializer both as a module (repo root on the
+# path) and when run directly as a script from utilities/
+try:
+    from utilities.firebase_init import get_app
+except ImportError:
+    from firebase_init import get_app
+
+# Buffered logging: records accumulate in memory and flush in bulk so
+# listing many users doesn't contend on the stdout lock per line
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logger.addHandler(logging.handlers.MemoryHandler(
+        capacity=512, target=logging.StreamHandler()
+    ))
+    logger.setLevel(logging.INFO)
 
 def check_current_user():
     # Check if a streamlit session state file exists
     try:
-        # Print the session state from the Streamlit app
-        print("Session state information (if available):")
+        # Log the session state from the Streamlit app
+        logger.info("Session state information (if available):")
         st_path = os.path.join(os.path.expanduser("~"), ".streamlit/config.toml")
         if os.path.exists(st_path):
-            print(f"Streamlit config exists at: {st_path}")
-        
+            logger.info("Streamlit config exists at: %s", st_path)
+
         # Check if Firebase Admin SDK is initialized and get all users
         try:
-            try:
-                app = firebase_admin.get_app()
-            except ValueError:
-                # Initialize Firebase if not already done
-                service_account_path = os.getenv(
-                    "FIREBASE_SERVICE_ACCOUNT", 
-                    "./chatbot-c14e4-firebase-adminsdk-fbsvc-1cca11cb3e.json"
-                )
-                cred = credentials.Certificate(service_account_path)
-                app = firebase_admin.initialize_app(cred)
-
-            # List all users
-            print("\nAttempting to list Firebase users:")
+            if get_app() is None:
+                logger.error("Failed to initialize Firebase")
+                return
+
+            # List all users, walking pages explicitly. Avoid iterate_all():
+            # its iterator re-evaluates the `users` computed property per
+            # element, so we cache each page's users in a local instead.
+            logger.info("Attempting to list Firebase users:")
+            total_users = 0
             page = auth.list_users()
-            for user in page.users:
-                print(f"Found user: {user.uid} ({user.email})")
-                
-            if not page.users:
-                print("No users found in Firebase Authentication.")
+            while page:
+                page_users = page.users
+                for user in page_users:
+                    logger.info("Found user: %s (%s)", user.uid, user.email)
+                total_users += len(page_users)
+                page = page.get_next_page() if page.has_next_page else None
+
+            if total_users == 0:
+                logger.info("No users found in Firebase Authentication.")
         except Exception as e:
-            print(f"Error accessing Firebase: {str(e)}")
-            
+            logger.error("Error accessing Firebase: %s", str(e))
+
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.error("Error: %s", str(e))
 
 if __name__ == "__main__":
     check_current_user()
@@ -1,66 +1,89 @@
-import os
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
-import json
+import logging
+import logging.handlers
+from firebase_admin import auth, firestore
 
-# Initialize Firebase Admin SDK
-def initialize_firebase():
-    try:
-        service_account_path = os.getenv(
-            "FIREBASE_SERVICE_ACCOUNT", 
-            "./chatbot-c14e4-firebase-adminsdk-fbsvc-1cca11cb3e.json"
-        )
-        cred = credentials.Certificate(service_account_path)
-        
-        # Check if any Firebase app is already initialized
-        try:
-            return firebase_admin.get_app()
-        except ValueError:
-            # No app exists, initialize default app
-            return firebase_admin.initialize_app(cred)
-    except Exception as e:
-        print(f"Failed to initialize Firebase Admin SDK: {str(e)}")
-        return None
+# Resolve the shared initializer both as a module (repo root on the
+# path) and when run directly as a script from utilities/
+try:
+    from utilities.firebase_init import get_app
+except ImportError:
+    from firebase_init import get_app
+
+# Buffered logging: records accumulate in memory and flush in bulk so
+# high-frequency scans don't contend on the stdout lock per line
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logger.addHandler(logging.handlers.MemoryHandler(
+        capacity=512, target=logging.StreamHandler()
+    ))
+    logger.setLevel(logging.INFO)
+
+# Firebase Auth allows at most 100 identifiers per get_users() call
+AUTH_LOOKUP_BATCH_SIZE = 100
+
+# Find which of the buffered users are missing from Firebase Auth
+def find_stale_in_batch(user_batch):
+    identifiers = [auth.UidIdentifier(uid) for uid, _ in user_batch]
+    result = auth.get_users(identifiers)
+    found_uids = {user.uid for user in result.users}
+    return [(uid, email) for uid, email in user_batch if uid not in found_uids]
 
 # Clean up stale user records that exist in Firestore but not in Firebase Auth
 def cleanup_stale_users():
-    app = initialize_firebase()
+    app = get_app()
     if not app:
         return "Failed to initialize Firebase"
-    
+
     db = firestore.client()
-    
-    # Get all users from Firestore
-    firestore_users = db.collection('users').stream()
-    
+
+    # Get all users from Firestore; project only email since the doc id
+    # comes for free and profile fields would be wasted bandwidth
+    firestore_users = db.collection('users').select(['email']).stream()
+
     cleaned_count = 0
     stale_users = []
-    
+    stale_uids = []
+
+    # Batch auth existence checks: one get_users() RPC per 100 users
+    # instead of one get_user() round-trip per user
+    user_batch = []
     for user_doc in firestore_users:
-        user_id = user_doc.id
-        user_data = user_doc.to_dict()
-        email = user_data.get('email')
-        
-        try:
-            # Check if user exists in Firebase Auth
-            auth.get_user(user_id)
-            # If the above doesn't throw an error, the user exists in Auth
-        except firebase_admin.exceptions.NotFoundError:
+        user_batch.append((user_doc.id, user_doc.to_dict().get('email')))
+        if len(user_batch) < AUTH_LOOKUP_BATCH_SIZE:
+            continue
+
+        for uid, email in find_stale_in_batch(user_batch):
             # User doesn't exist in Auth but exists in Firestore - stale record
-            print(f"Found stale user: {email} ({user_id}) - removing from Firestore")
-            stale_users.append(f"{email} ({user_id})")
-            
-            # Delete from Firestore
-            db.collection('users').document(user_id).delete()
+            logger.info("Found stale user: %s (%s) - removing from Firestore", email, uid)
+            stale_users.append(f"{email} ({uid})")
+            stale_uids.append(uid)
+            cleaned_count += 1
+        user_batch = []
+
+    # Check the remaining partial batch
+    if user_batch:
+        for uid, email in find_stale_in_batch(user_batch):
+            logger.info("Found stale user: %s (%s) - removing from Firestore", email, uid)
+            stale_users.append(f"{email} ({uid})")
+            stale_uids.append(uid)
             cleaned_count += 1
-    
+
+    # BulkWriter pipelines deletes in parallel with automatic chunking
+    # to 500 ops, retry, and backoff - no hand-rolled batching needed
+    if stale_uids:
+        bulk_writer = db.bulk_writer()
+        for uid in stale_uids:
+            bulk_writer.delete(db.collection('users').document(uid))
+        bulk_writer.flush()
+        bulk_writer.close()
+
     if cleaned_count > 0:
-        print(f"\nCleaned up {cleaned_count} stale user records:")
+        logger.info("Cleaned up %d stale user records:", cleaned_count)
         for user in stale_users:
-            print(f"- {user}")
+            logger.info("- %s", user)
         return f"Cleaned up {cleaned_count} stale user records"
     else:
-        print("No stale user records found")
+        logger.info("No stale user records found")
         return "No stale user records found"
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+import os
+import firebase_admin
+from firebase_admin import credentials
+
+# Only a successful app is cached; a failed attempt (e.g. a transient
+# credential error) is retried on the next call instead of pinning None
+# for the rest of the process
+_APP = None
+
+
+def get_app():
+    """
+    Return the Firebase Admin app, initializing it once per process.
+
+    Parsing the service account certificate constructs an RSA key, so
+    the app is cached after the first successful initialization.
+    """
+    global _APP
+    if _APP is not None:
+        return _APP
+    try:
+        # Check if any Firebase app is already initialized
+        try:
+            _APP = firebase_admin.get_app()
+        except ValueError:
+            # No app exists, initialize default app
+            service_account_path = os.getenv(
+                "FIREBASE_SERVICE_ACCOUNT",
+                "./chatbot-c14e4-firebase-adminsdk-fbsvc-1cca11cb3e.json"
+            )
+            cred = credentials.Certificate(service_account_path)
+            _APP = firebase_admin.initialize_app(cred)
+        return _APP
+    except Exception as e:
+        print(f"Failed to initialize Firebase Admin SDK: {str(e)}")
+        return None
@@ -5,10 +5,175 @@ Provides functionality to log sensitive queries and access attempts
 for compliance and security purposes.
 """
 
+import atexit
+import base64
+import queue
+import threading
+import time
 import firebase_admin
+from concurrent.futures import ThreadPoolExecutor
 from firebase_admin import firestore
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Sequence
+
+# orjson encodes/decodes several times faster than stdlib json and
+# matters at audit-log rates; fall back to stdlib when unavailable
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+# Module-level Firestore client shared by all AuditLogger instances so
+# each construction doesn't pay gRPC channel setup again
+_DB = None
+_DB_LOCK = threading.Lock()
+
+
+def _get_db():
+    """Return the shared Firestore client, creating it on first use"""
+    global _DB
+    if _DB is None:
+        with _DB_LOCK:
+            if _DB is None:
+                _DB = firestore.client()
+    return _DB
+
+
+# Audit writes are fire-and-forget: they run off the request path on a
+# bounded executor, with pending writes flushed at interpreter exit
+_AUDIT_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="audit")
+atexit.register(_AUDIT_EXECUTOR.shutdown, wait=True)
+
+# High-frequency entries are coalesced into WriteBatch commits of up to
+# 500 ops, flushed whenever 200 ms pass without the batch filling
+_WRITE_BATCH_SIZE = 500
+_FLUSH_INTERVAL_SECONDS = 0.2
+_QUEUE = queue.Queue(maxsize=10000)
+_DRAIN_THREAD = None
+_DRAIN_LOCK = threading.Lock()
+
+
+def _drain_loop():
+    """Daemon loop batching queued audit entries into single commits
+
+    Entries are queued as (collection_name, log_data) pairs so loggers
+    with different collections can share one queue and thread; a batch
+    may span collections since WriteBatch ops name their own documents.
+    """
+    while True:
+        try:
+            entries = [_QUEUE.get()]
+            while len(entries) < _WRITE_BATCH_SIZE:
+                try:
+                    entries.append(_QUEUE.get(timeout=_FLUSH_INTERVAL_SECONDS))
+                except queue.Empty:
+                    break
+
+            db = _get_db()
+            batch = db.batch()
+            for collection_name, entry in entries:
+                batch.create(db.collection(collection_name).document(), entry)
+            batch.commit()
+        except Exception as e:
+            print(f"Error flushing audit batch: {str(e)}")
+
+
+def _flush_queue():
+    """Drain queued entries into final batch commits at interpreter exit
+
+    The drain thread is a daemon, so anything still queued when the
+    process exits would otherwise be lost silently.
+    """
+    entries = []
+    while True:
+        try:
+            entries.append(_QUEUE.get_nowait())
+        except queue.Empty:
+            break
+    if not entries:
+        return
+    try:
+        db = _get_db()
+        for start in range(0, len(entries), _WRITE_BATCH_SIZE):
+            batch = db.batch()
+            for collection_name, entry in entries[start:start + _WRITE_BATCH_SIZE]:
+                batch.create(db.collection(collection_name).document(), entry)
+            batch.commit()
+    except Exception as e:
+        print(f"Error flushing audit batch: {str(e)}")
+
+
+atexit.register(_flush_queue)
+
+
+def _ensure_drain_thread():
+    """Start the batching drain thread on first use"""
+    global _DRAIN_THREAD
+    if _DRAIN_THREAD is None:
+        with _DRAIN_LOCK:
+            if _DRAIN_THREAD is None:
+                _DRAIN_THREAD = threading.Thread(
+                    target=_drain_loop,
+                    name="audit-drain",
+                    daemon=True
+                )
+                _DRAIN_THREAD.start()
+
+
+# Default projection for the log viewer: skips the bulky query/reason
+# text so reads move fewer bytes and build smaller dicts
+_DEFAULT_LOG_FIELDS = ("timestamp", "user_email", "user_role", "action_taken")
+
+# Short-TTL cache absorbing repeated log-viewer polls for the same page;
+# entries are invalidated when that user logs a new event
+_LOG_CACHE: Dict[tuple, tuple] = {}
+_LOG_CACHE_TTL_SECONDS = 10.0
+_LOG_CACHE_MAX_ENTRIES = 1024
+_LOG_CACHE_LOCK = threading.Lock()
+
+
+def _log_cache_get(key):
+    """Return a cached page if present and not expired, else None"""
+    with _LOG_CACHE_LOCK:
+        entry = _LOG_CACHE.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del _LOG_CACHE[key]
+            return None
+        return value
+
+
+def _log_cache_put(key, value):
+    """Store a page result, evicting expired entries when full"""
+    with _LOG_CACHE_LOCK:
+        if len(_LOG_CACHE) >= _LOG_CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            expired = [k for k, (t, _) in _LOG_CACHE.items() if now >= t]
+            for k in expired:
+                del _LOG_CACHE[k]
+            if len(_LOG_CACHE) >= _LOG_CACHE_MAX_ENTRIES:
+                _LOG_CACHE.clear()
+        _LOG_CACHE[key] = (time.monotonic() + _LOG_CACHE_TTL_SECONDS, value)
+
+
+def _log_cache_invalidate_user(user_email: str):
+    """Drop cached pages for a user after they log a new event"""
+    with _LOG_CACHE_LOCK:
+        stale = [k for k in _LOG_CACHE if k[0] == user_email]
+        for k in stale:
+            del _LOG_CACHE[k]
 
 
 class AuditLogger:
@@ -16,89 +181,209 @@ class AuditLogger:
     Records audit logs for sensitive operations, particularly financial
     data access attempts.
     """
-    
+
     def __init__(self, collection_name: str = "sensitive_query_logs"):
         """
         Initialize the audit logger
-        
+
         Args:
             collection_name: Firestore collection to store logs in
         """
-        self.db = firestore.client()
+        self.db = _get_db()
         self.collection_name = collection_name
-    
-    def log_sensitive_query(self, log_data: Dict[str, Any]) -> Optional[str]:
+
+        # Queries are immutable builders, so the ordered base query for
+        # recent logs can be constructed once and varied per call. The
+        # explicit __name__ order-by makes the (timestamp, doc_id)
+        # pagination cursor apply fully: the client normalizes dict
+        # cursors against explicit order-by keys only, and batched
+        # writes give whole groups of entries identical timestamps
+        self._base_recent = (self.db.collection(self.collection_name)
+                             .order_by("timestamp", direction=firestore.Query.DESCENDING)
+                             .order_by("__name__", direction=firestore.Query.DESCENDING))
+
+    def log_sensitive_query(self, log_data: Dict[str, Any]) -> None:
         """
         Record a sensitive query to the audit log
-        
+
+        Entries are queued and flushed in batched commits by a background
+        thread, so the request path never blocks on a Firestore round-trip.
+
         Args:
             log_data: Dictionary with audit details
-            
-        Returns:
-            ID of the created log entry, or None if failed
         """
+        # Let Firestore assign an authoritative server-side timestamp
+        # rather than a skew-prone client clock value
+        log_data.setdefault("timestamp", firestore.SERVER_TIMESTAMP)
+
+        # New events make any cached pages for this user stale
+        if "user_email" in log_data:
+            _log_cache_invalidate_user(log_data["user_email"])
+
+        _ensure_drain_thread()
+        try:
+            _QUEUE.put_nowait((self.collection_name, log_data))
+        except queue.Full:
+            # Never drop audits: fall back to a direct background write
+            _AUDIT_EXECUTOR.submit(self._do_add, log_data)
+
+    def _do_add(self, log_data: Dict[str, Any]) -> Optional[str]:
+        """Write a single audit entry to Firestore (executor worker)"""
         try:
-            # Ensure timestamp exists
-            if "timestamp" not in log_data:
-                log_data["timestamp"] = datetime.now()
-                
-            # Add to Firestore
             doc_ref = self.db.collection(self.collection_name).add(log_data)
             return doc_ref[1].id
         except Exception as e:
             print(f"Error logging sensitive query: {str(e)}")
             return None
-    
-    def get_logs_for_user(self, user_email: str, limit: int = 100) -> list:
+
+    def _encode_cursor(self, timestamp: datetime, doc_id: str) -> str:
+        """Encode a (timestamp, doc_id) pagination cursor as base64url"""
+        payload = _json_dumps({"timestamp": timestamp.isoformat(), "doc_id": doc_id})
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple:
+        """Decode a base64url cursor back to (timestamp, doc_id)"""
+        payload = _json_loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["timestamp"]), payload["doc_id"]
+
+    def _paginate(self, query, limit: int, start_after: Optional[str],
+                  fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Run a timestamp-ordered query with cursor pagination
+
+        Fetches limit + 1 docs to detect whether another page exists;
+        the extra doc is dropped and its predecessor becomes the cursor.
+
+        Args:
+            query: Firestore query ordered by timestamp descending
+            limit: Maximum number of logs per page
+            start_after: Optional cursor from a previous page
+            fields: Optional projection; only these fields are fetched
+
+        Returns:
+            Dictionary with 'logs' and 'next_cursor' (None on last page)
+        """
+        if fields:
+            # timestamp must survive the projection for cursor encoding
+            if "timestamp" not in fields:
+                fields = list(fields) + ["timestamp"]
+            query = query.select(list(fields))
+
+        if start_after:
+            timestamp, doc_id = self._decode_cursor(start_after)
+            query = query.start_after({
+                "timestamp": timestamp,
+                "__name__": self.db.collection(self.collection_name).document(doc_id)
+            })
+
+        logs = list(self._iter_docs(query.limit(limit + 1)))
+
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            last = logs[-1]
+            next_cursor = self._encode_cursor(last["timestamp"], last["id"])
+
+        return {"logs": logs, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _iter_docs(query) -> Iterator[Dict[str, Any]]:
+        """Yield log dicts from a query stream one at a time"""
+        for doc in query.stream():
+            log_entry = doc.to_dict()
+            log_entry["id"] = doc.id
+            yield log_entry
+
+    def iter_logs_for_user(self, user_email: str, limit: int = 100,
+                           fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream audit logs for a user without materializing the page
+
+        Useful for one-pass consumers (CSV export, JSON streaming) that
+        don't need pagination cursors; peak memory is a single entry.
+
+        Args:
+            user_email: Email of the user to get logs for
+            limit: Maximum number of logs to yield
+            fields: Optional projection; only these fields are fetched
+
+        Yields:
+            Log entry dictionaries ordered by timestamp descending
+        """
+        query = (self.db.collection(self.collection_name)
+                .where("user_email", "==", user_email)
+                .order_by("timestamp", direction=firestore.Query.DESCENDING))
+        if fields:
+            query = query.select(list(fields))
+        yield from self._iter_docs(query.limit(limit))
+
+    def iter_recent_logs(self, limit: int = 100,
+                         fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream recent audit logs for all users without materializing them
+
+        Args:
+            limit: Maximum number of logs to yield
+            fields: Optional projection; only these fields are fetched
+
+        Yields:
+            Log entry dictionaries ordered by timestamp descending
+        """
+        query = self._base_recent
+        if fields:
+            query = query.select(list(fields))
+        yield from self._iter_docs(query.limit(limit))
+
+    def get_logs_for_user(self, user_email: str, limit: int = 100,
+                          start_after: Optional[str] = None,
+                          fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
         """
         Retrieve audit logs for a specific user
-        
+
         Args:
             user_email: Email of the user to get logs for
-            limit: Maximum number of logs to retrieve
-            
+            limit: Maximum number of logs to retrieve per page
+            start_after: Optional pagination cursor from a previous call
+            fields: Optional projection; defaults to all fields
+
         Returns:
-            List of log entries
+            Dictionary with 'logs' and 'next_cursor' for the next page
         """
         try:
+            cache_key = (user_email, limit, start_after,
+                         tuple(fields) if fields else None)
+            cached = _log_cache_get(cache_key)
+            if cached is not None:
+                return cached
+
             query = (self.db.collection(self.collection_name)
                     .where("user_email", "==", user_email)
                     .order_by("timestamp", direction=firestore.Query.DESCENDING)
-                    .limit(limit))
-            
-            logs = []
-            for doc in query.stream():
-                log_entry = doc.to_dict()
-                log_entry["id"] = doc.id
-                logs.append(log_entry)
-            
-            return logs
+                    .order_by("__name__", direction=firestore.Query.DESCENDING))
+
+            result = self._paginate(query, limit, start_after, fields)
+            _log_cache_put(cache_key, result)
+            return result
         except Exception as e:
             print(f"Error retrieving logs: {str(e)}")
-            return []
-    
-    def get_recent_logs(self, limit: int = 100) -> list:
+            return {"logs": [], "next_cursor": None}
+
+    def get_recent_logs(self, limit: int = 100,
+                        start_after: Optional[str] = None,
+                        fields: Optional[Sequence[str]] = _DEFAULT_LOG_FIELDS) -> Dict[str, Any]:
         """
         Retrieve recent audit logs for all users
-        
+
         Args:
-            limit: Maximum number of logs to retrieve
-            
+            limit: Maximum number of logs to retrieve per page
+            start_after: Optional pagination cursor from a previous call
+            fields: Projection to fetch; pass None for full documents
+
         Returns:
-            List of log entries ordered by timestamp
+            Dictionary with 'logs' ordered by timestamp and 'next_cursor'
         """
         try:
-            query = (self.db.collection(self.collection_name)
-                    .order_by("timestamp", direction=firestore.Query.DESCENDING)
-                    .limit(limit))
-            
-            logs = []
-            for doc in query.stream():
-                log_entry = doc.to_dict()
-                log_entry["id"] = doc.id
-                logs.append(log_entry)
-            
-            return logs
+            return self._paginate(self._base_recent, limit, start_after, fields)
         except Exception as e:
             print(f"Error retrieving logs: {str(e)}")
-            return []
+            return {"logs": [], "next_cursor": None}
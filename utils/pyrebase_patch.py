@@ -1,5 +1,8 @@
 import sys
-import os
+import types
+
+# Applied at most once per interpreter; re-imports return immediately
+_PATCHED = False
 
 # Execute this patch before any pyrebase import
 def patch_pyrebase():
@@ -7,39 +10,52 @@ def patch_pyrebase():
     Fixes the Pyrebase4 compatibility issue with newer versions of requests
     by adding a mock module for the removed vendored urllib3 in requests
     """
-    # Only apply patch if module doesn't exist
-    if 'requests.packages.urllib3.contrib.appengine' not in sys.modules:
-        # Create the path to the mock module
-        import requests
-        requests_path = os.path.dirname(requests.__file__)
-        
-        # Create mock packages
-        if not hasattr(requests, 'packages'):
-            requests.packages = type('MockPackages', (), {})()
-        
-        if not hasattr(requests.packages, 'urllib3'):
-            requests.packages.urllib3 = type('MockUrllib3', (), {})()
-        
-        if not hasattr(requests.packages.urllib3, 'contrib'):
-            requests.packages.urllib3.contrib = type('MockContrib', (), {})()
-        
-        if not hasattr(requests.packages.urllib3.contrib, 'appengine'):
-            requests.packages.urllib3.contrib.appengine = type('MockAppEngine', (), {})()
-            
-        # Define the missing function
-        if not hasattr(requests.packages.urllib3.contrib.appengine, 'is_appengine_sandbox'):
-            requests.packages.urllib3.contrib.appengine.is_appengine_sandbox = lambda: False
-            
-        sys.modules['requests.packages'] = requests.packages
-        sys.modules['requests.packages.urllib3'] = requests.packages.urllib3
-        sys.modules['requests.packages.urllib3.contrib'] = requests.packages.urllib3.contrib
-        sys.modules['requests.packages.urllib3.contrib.appengine'] = requests.packages.urllib3.contrib.appengine
-        
-        # Also fix the gaecontrib import issue
-        try:
-            from requests_toolbelt import _compat
-            if not hasattr(_compat, 'gaecontrib'):
-                _compat.gaecontrib = type('MockGaecontrib', (), {})()
-                _compat.gaecontrib.is_appengine = lambda: False
-        except ImportError:
-            pass
+    global _PATCHED
+    if _PATCHED or 'requests.packages.urllib3.contrib.appengine' in sys.modules:
+        _PATCHED = True
+        return
+
+    import requests
+
+    # Fill in only the missing levels of the tree, walking it once with
+    # getattr instead of a hasattr probe plus re-traversal per level
+    packages = getattr(requests, 'packages', None)
+    if packages is None:
+        packages = types.SimpleNamespace()
+        requests.packages = packages
+
+    urllib3 = getattr(packages, 'urllib3', None)
+    if urllib3 is None:
+        urllib3 = types.SimpleNamespace()
+        packages.urllib3 = urllib3
+
+    contrib = getattr(urllib3, 'contrib', None)
+    if contrib is None:
+        contrib = types.SimpleNamespace()
+        urllib3.contrib = contrib
+
+    appengine = getattr(contrib, 'appengine', None)
+    if appengine is None:
+        appengine = types.SimpleNamespace()
+        contrib.appengine = appengine
+
+    # Define the missing function
+    if not hasattr(appengine, 'is_appengine_sandbox'):
+        appengine.is_appengine_sandbox = lambda: False
+
+    sys.modules.update({
+        'requests.packages': packages,
+        'requests.packages.urllib3': urllib3,
+        'requests.packages.urllib3.contrib': contrib,
+        'requests.packages.urllib3.contrib.appengine': appengine,
+    })
+
+    # Also fix the gaecontrib import issue
+    try:
+        from requests_toolbelt import _compat
+        if not hasattr(_compat, 'gaecontrib'):
+            _compat.gaecontrib = types.SimpleNamespace(is_appengine=lambda: False)
+    except ImportError:
+        pass
+
+    _PATCHED = True